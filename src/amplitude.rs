@@ -1,3 +1,4 @@
+use num_traits::pow::Pow;
 use parking_lot::RwLock;
 use rayon::prelude::*;
 use rustc_hash::FxHashMap as HashMap;
@@ -81,13 +82,49 @@ enum Operation<'a> {
     Imag(Amplitude<'a>),
 }
 
+/// An [`Amplitude`] tree whose leaves have had their internal parameters resolved against a
+/// [`ParMap`] (see [`Amplitude::bind`]).
+enum BoundAmplitude<'b, 'p> {
+    Function(&'b SendableAmpFn, ParMap<'p>),
+    Unset,
+    Unary(fn(Complex64) -> Complex64, Box<BoundAmplitude<'b, 'p>>),
+    Binary(
+        fn(Complex64, Complex64) -> Complex64,
+        Box<BoundAmplitude<'b, 'p>>,
+        Box<BoundAmplitude<'b, 'p>>,
+    ),
+}
+
+impl<'b, 'p> BoundAmplitude<'b, 'p> {
+    fn unary(op: fn(Complex64) -> Complex64, a: Self) -> Self {
+        Self::Unary(op, Box::new(a))
+    }
+
+    fn binary(op: fn(Complex64, Complex64) -> Complex64, a: Self, b: Self) -> Self {
+        Self::Binary(op, Box::new(a), Box::new(b))
+    }
+
+    fn evaluate(&self, vars: &VarMap) -> Result<Complex64, Box<dyn Error + Send + Sync>> {
+        match self {
+            Self::Function(function, pars) => function(pars, vars),
+            Self::Unset => Err("Function is not set".into()),
+            Self::Unary(op, a) => Ok(op(a.evaluate(vars)?)),
+            Self::Binary(op, a, b) => {
+                let res_a = a.evaluate(vars)?;
+                let res_b = b.evaluate(vars)?;
+                Ok(op(res_a, res_b))
+            }
+        }
+    }
+}
+
 pub type ParMap<'a> = HashMap<String, Parameter<'a>>;
 pub type VarMap = HashMap<String, FieldType>;
 pub type SendableAmpFn =
     dyn Fn(&ParMap, &VarMap) -> Result<Complex64, Box<dyn Error + Send + Sync>> + Send + Sync;
-pub type ArcAmpFn = Arc<RwLock<SendableAmpFn>>;
+pub type ArcAmpFn = Arc<SendableAmpFn>;
 pub type SendableVarFn = dyn Fn(&VarMap) -> FieldType + Send + Sync;
-pub type ArcVarFn = Arc<RwLock<SendableVarFn>>;
+pub type ArcVarFn = Arc<SendableVarFn>;
 
 #[derive(Default, Clone)]
 pub struct Amplitude<'a> {
@@ -96,7 +133,7 @@ pub struct Amplitude<'a> {
     internal_parameters: Arc<RwLock<Vec<String>>>,
     pub external_parameters: Arc<RwLock<HashMap<String, Parameter<'a>>>>,
     parameter_mappings: Arc<RwLock<HashMap<Parameter<'a>, String>>>,
-    op: Option<Arc<RwLock<Operation<'a>>>>,
+    op: Option<Arc<Operation<'a>>>,
     dependencies: Option<Vec<Variable>>,
 }
 
@@ -156,7 +193,7 @@ impl<'a> Amplitude<'a> {
         };
         Amplitude {
             name: Arc::new(name.to_string()),
-            function: Some(Arc::new(RwLock::new(function))),
+            function: Some(Arc::new(function)),
             dependencies,
             internal_parameters,
             ..Default::default()
@@ -183,77 +220,118 @@ impl<'a> Amplitude<'a> {
         }
     }
 
-    fn _evaluate(
-        &self,
-        pars: &ParMap,
-        vars: &VarMap,
-    ) -> Result<Complex64, Box<dyn Error + Send + Sync>> {
-        let internal_pars = self
-            .parameter_mappings
+    /// Resolve every leaf's internal parameters against `pars` once, so that evaluating the
+    /// result over many events only does the per-event work.
+    fn bind<'b, 'p>(&'b self, pars: &ParMap<'p>) -> BoundAmplitude<'b, 'p> {
+        match self.op.as_deref() {
+            Some(Operation::Add(a, b)) => {
+                BoundAmplitude::binary(|x, y| x + y, a.bind(pars), b.bind(pars))
+            }
+            Some(Operation::Sub(a, b)) => {
+                BoundAmplitude::binary(|x, y| x - y, a.bind(pars), b.bind(pars))
+            }
+            Some(Operation::Mul(a, b)) => {
+                BoundAmplitude::binary(|x, y| x * y, a.bind(pars), b.bind(pars))
+            }
+            Some(Operation::Div(a, b)) => {
+                BoundAmplitude::binary(|x, y| x / y, a.bind(pars), b.bind(pars))
+            }
+            Some(Operation::Pow(a, b)) => {
+                BoundAmplitude::binary(Complex64::powc, a.bind(pars), b.bind(pars))
+            }
+            Some(Operation::Neg(a)) => BoundAmplitude::unary(|x| -1.0 * x, a.bind(pars)),
+            Some(Operation::Sqrt(a)) => BoundAmplitude::unary(Complex64::sqrt, a.bind(pars)),
+            Some(Operation::NormSquare(a)) => {
+                BoundAmplitude::unary(|x| x.norm_sqr().into(), a.bind(pars))
+            }
+            Some(Operation::Real(a)) => BoundAmplitude::unary(|x| x.re.into(), a.bind(pars)),
+            Some(Operation::Imag(a)) => BoundAmplitude::unary(|x| x.im.into(), a.bind(pars)),
+            None => match &self.function {
+                Some(func_arc) => BoundAmplitude::Function(&**func_arc, self.internal_pars(pars)),
+                None => BoundAmplitude::Unset,
+            },
+        }
+    }
+
+    /// Map the external parameters in `pars` onto this amplitude's internal parameter names.
+    fn internal_pars<'p>(&self, pars: &ParMap<'p>) -> ParMap<'p> {
+        self.parameter_mappings
             .read()
             .iter()
             .filter_map(|(external, internal)| {
                 pars.get(external.name).map(|par| (internal.clone(), *par))
             })
-            .collect();
-        if let Some(ref func_arc) = self.function {
-            let func_rwlock = func_arc.read();
-            func_rwlock(&internal_pars, vars)
-        } else {
-            Err("Function is not set".into())
-        }
+            .collect()
     }
 
     /// Evaluate an amplitude for a set of parameters `pars` and a set of variables `vars`.
     ///
+    /// Each leaf amplitude resolves its internal parameters against `pars` on every call. To
+    /// evaluate many events with the same parameters, use [`Amplitude::evaluate_many`],
+    /// [`Amplitude::evaluate_on`], or [`Amplitude::par_evaluate_on`], which only do this once.
+    ///
     /// # Errors
     ///
     /// Returns an error if anything happens to raise an error in the evaluation of any
-    /// sub-amplitudes or in running _evaluate, which will either pass errors from the internal
-    /// amplitude's function, or will raise an error if the amplitude has no set function.
+    /// sub-amplitudes, which will either pass errors from the internal amplitude's function, or
+    /// will raise an error if the amplitude has no set function.
     pub fn evaluate(
         &self,
         pars: &ParMap,
         vars: &VarMap,
     ) -> Result<Complex64, Box<dyn Error + Send + Sync>> {
-        if let Some(op) = &self.op {
-            let op_lock = op.read();
-            match &*op_lock {
-                Operation::Add(a, b) => {
-                    let res_a = a.evaluate(pars, vars)?;
-                    let res_b = b.evaluate(pars, vars)?;
-                    Ok(res_a + res_b)
-                }
-                Operation::Sub(a, b) => {
-                    let res_a = a.evaluate(pars, vars)?;
-                    let res_b = b.evaluate(pars, vars)?;
-                    Ok(res_a - res_b)
-                }
-                Operation::Mul(a, b) => {
-                    let res_a = a.evaluate(pars, vars)?;
-                    let res_b = b.evaluate(pars, vars)?;
-                    Ok(res_a * res_b)
-                }
-                Operation::Div(a, b) => {
-                    let res_a = a.evaluate(pars, vars)?;
-                    let res_b = b.evaluate(pars, vars)?;
-                    Ok(res_a / res_b)
-                }
-                Operation::Pow(a, b) => {
-                    let res_a = a.evaluate(pars, vars)?;
-                    let res_b = b.evaluate(pars, vars)?;
-                    Ok(res_a.powc(res_b))
-                }
-                Operation::Neg(a) => Ok(-1.0 * a.evaluate(pars, vars)?),
-                Operation::Sqrt(a) => Ok(a.evaluate(pars, vars)?.sqrt()),
-                Operation::NormSquare(a) => Ok(a.evaluate(pars, vars)?.norm_sqr().into()),
-                Operation::Real(a) => Ok(a.evaluate(pars, vars)?.re.into()),
-                Operation::Imag(a) => Ok(a.evaluate(pars, vars)?.im.into()),
-            }
-        } else {
-            self._evaluate(pars, vars)
+        match self.op.as_deref() {
+            Some(Operation::Add(a, b)) => Ok(a.evaluate(pars, vars)? + b.evaluate(pars, vars)?),
+            Some(Operation::Sub(a, b)) => Ok(a.evaluate(pars, vars)? - b.evaluate(pars, vars)?),
+            Some(Operation::Mul(a, b)) => Ok(a.evaluate(pars, vars)? * b.evaluate(pars, vars)?),
+            Some(Operation::Div(a, b)) => Ok(a.evaluate(pars, vars)? / b.evaluate(pars, vars)?),
+            Some(Operation::Pow(a, b)) => Ok(a.evaluate(pars, vars)?.powc(b.evaluate(pars, vars)?)),
+            Some(Operation::Neg(a)) => Ok(-1.0 * a.evaluate(pars, vars)?),
+            Some(Operation::Sqrt(a)) => Ok(a.evaluate(pars, vars)?.sqrt()),
+            Some(Operation::NormSquare(a)) => Ok(a.evaluate(pars, vars)?.norm_sqr().into()),
+            Some(Operation::Real(a)) => Ok(a.evaluate(pars, vars)?.re.into()),
+            Some(Operation::Imag(a)) => Ok(a.evaluate(pars, vars)?.im.into()),
+            None => match &self.function {
+                Some(func_arc) => func_arc(&self.internal_pars(pars), vars),
+                None => Err("Function is not set".into()),
+            },
         }
     }
+
+    /// Evaluate an amplitude for a set of parameters `pars` over each set of variables in `vars`,
+    /// resolving the parameters only once.
+    ///
+    /// # Errors
+    ///
+    /// Returns the first error raised while evaluating any of the entries in `vars` (see
+    /// [`Amplitude::evaluate`]).
+    ///
+    /// # Examples
+    ///
+    /// ```
+    /// use num_complex::Complex64;
+    /// use rustitude::prelude::*;
+    ///
+    /// let a = Amplitude::new("A", |pars: &ParMap, _vars: &VarMap| Ok(pars["x"].value.cscalar().unwrap()), Some(vec!["x"]), None);
+    /// let b = Amplitude::new("B", |pars: &ParMap, _vars: &VarMap| Ok(pars["x"].value.cscalar().unwrap()), Some(vec!["x"]), None);
+    /// a.assign(&cpar!("pa", 1.0, 2.0), "x");
+    /// b.assign(&cpar!("pb", 3.0, -1.0), "x");
+    /// let amp = (&a * &b).norm_sqr();
+    /// let pars: ParMap = amp.external_parameters.read().clone();
+    ///
+    /// let d: Dataset = Dataset::new(3);
+    /// let res = amp.evaluate_many(&pars, &d.entries).unwrap();
+    /// assert_eq!(res, vec![Complex64::new(50.0, 0.0); 3]);
+    /// assert_eq!(amp.evaluate(&pars, &d.entries[0]).unwrap(), res[0]);
+    /// ```
+    pub fn evaluate_many(
+        &self,
+        pars: &ParMap,
+        vars: &[VarMap],
+    ) -> Result<Vec<Complex64>, Box<dyn Error + Send + Sync>> {
+        let bound = self.bind(pars);
+        vars.iter().map(|entry| bound.evaluate(entry)).collect()
+    }
     pub fn resolve_dependencies(&self, dataset: &mut Dataset) {
         if let Some(deps) = &self.dependencies {
             for dep in deps {
@@ -280,254 +358,124 @@ impl<'a> Amplitude<'a> {
         let mut i: usize = 0;
         let mut e_pars_lock = self.external_parameters.write();
         for e_name in par_names {
-            if e_pars_lock.get_mut(*e_name).unwrap().value.is_scalar() {
-                e_pars_lock.get_mut(*e_name).unwrap().value = ParameterValue::Scalar(par_vals[i]);
+            let e_par = e_pars_lock.get_mut(*e_name).unwrap();
+            if e_par.value.is_scalar() {
+                e_par.value = ParameterValue::Scalar(par_vals[i]);
                 i += 1;
             } else {
-                e_pars_lock.get_mut(*e_name).unwrap().value =
-                    ParameterValue::CScalar(Complex64::new(par_vals[i], par_vals[i + 1]));
+                e_par.value = ParameterValue::CScalar(Complex64::new(par_vals[i], par_vals[i + 1]));
                 i += 2;
             }
         }
     }
     pub fn evaluate_on(&self, dataset: &Dataset) -> Vec<Complex64> {
-        let parameter_map: ParMap = self.external_parameters.read().clone();
+        let parameter_map: &ParMap = &self.external_parameters.read();
+        let bound = self.bind(parameter_map);
         dataset
             .entries
             .iter()
-            .filter_map(|entry| self.evaluate(&parameter_map, entry).ok())
+            .filter_map(|entry| bound.evaluate(entry).ok())
             .collect()
     }
 
     pub fn par_evaluate_on(&self, dataset: &Dataset) -> Vec<Complex64> {
-        let parameter_map: ParMap = self.external_parameters.read().clone();
+        let parameter_map: &ParMap = &self.external_parameters.read();
+        let bound = self.bind(parameter_map);
         dataset
             .entries
             .par_iter()
-            .filter_map(|entry| self.evaluate(&parameter_map, entry).ok())
+            .filter_map(|entry| bound.evaluate(entry).ok())
             .collect()
     }
+    /// Evaluate the amplitude over a dataset in parallel, map each result through `f`, and sum.
+    ///
+    /// The per-event values are reduced as they are produced rather than collected into a
+    /// [`Vec`] first. Unlike [`Amplitude::par_evaluate_on`], which drops events that fail to
+    /// evaluate, any failure is propagated instead of being left out of the sum.
+    ///
+    /// # Errors
+    ///
+    /// Returns an error if the evaluation of any event fails (see [`Amplitude::evaluate`]).
+    ///
+    /// # Examples
+    ///
+    /// ```
+    /// use rustitude::prelude::*;
+    ///
+    /// let amp = Amplitude::from(2.0);
+    /// let d: Dataset = Dataset::new(10);
+    /// assert_eq!(amp.par_sum_on(&d, |val| val.re).unwrap(), 20.0);
+    ///
+    /// // an amplitude with no function fails to evaluate
+    /// assert!(Amplitude::default().par_sum_on(&d, |val| val.re).is_err());
+    /// ```
+    pub fn par_sum_on<F>(
+        &self,
+        dataset: &Dataset,
+        f: F,
+    ) -> Result<f64, Box<dyn Error + Send + Sync>>
+    where
+        F: Fn(Complex64) -> f64 + Sync + Send,
+    {
+        let parameter_map: &ParMap = &self.external_parameters.read();
+        let bound = self.bind(parameter_map);
+        dataset
+            .entries
+            .par_iter()
+            .map(|entry| bound.evaluate(entry).map(&f))
+            .try_reduce(|| 0.0, |a, b| Ok(a + b))
+    }
     pub fn sqrt(&self) -> Amplitude<'a> {
-        Amplitude {
-            op: Some(Arc::new(RwLock::new(Operation::Sqrt(self.clone())))),
-            external_parameters: self.clone().external_parameters,
-            dependencies: self.clone().dependencies,
-            ..Default::default()
-        }
+        Amplitude::unary_op(self.clone(), Operation::Sqrt)
     }
     pub fn norm_sqr(&self) -> Amplitude<'a> {
-        Amplitude {
-            op: Some(Arc::new(RwLock::new(Operation::NormSquare(self.clone())))),
-            external_parameters: self.clone().external_parameters,
-            dependencies: self.clone().dependencies,
-            ..Default::default()
-        }
+        Amplitude::unary_op(self.clone(), Operation::NormSquare)
     }
     pub fn re(&self) -> Amplitude<'a> {
-        Amplitude {
-            op: Some(Arc::new(RwLock::new(Operation::Real(self.clone())))),
-            external_parameters: self.clone().external_parameters,
-            dependencies: self.clone().dependencies,
-            ..Default::default()
-        }
+        Amplitude::unary_op(self.clone(), Operation::Real)
     }
     pub fn real(&self) -> Amplitude<'a> {
         self.re()
     }
     pub fn im(&self) -> Amplitude<'a> {
-        Amplitude {
-            op: Some(Arc::new(RwLock::new(Operation::Imag(self.clone())))),
-            external_parameters: self.clone().external_parameters,
-            dependencies: self.clone().dependencies,
-            ..Default::default()
-        }
+        Amplitude::unary_op(self.clone(), Operation::Imag)
     }
     pub fn imag(&self) -> Amplitude<'a> {
         self.im()
     }
-}
-
-impl<'a> Add for Amplitude<'a> {
-    type Output = Amplitude<'a>;
-
-    fn add(self, rhs: Amplitude<'a>) -> Self::Output {
-        let external_parameters = Arc::new(RwLock::new(
-            self.external_parameters
-                .read()
-                .clone()
-                .into_iter()
-                .chain(rhs.external_parameters.read().clone())
-                .collect(),
-        ));
-        let dependencies = match (self.dependencies.clone(), rhs.dependencies.clone()) {
-            (Some(deps_a), Some(deps_b)) => Some(deps_a.into_iter().chain(deps_b).collect()),
-            (Some(deps), None) | (None, Some(deps)) => Some(deps),
-            (None, None) => None,
-        };
-
-        Amplitude {
-            op: Some(Arc::new(RwLock::new(Operation::Add(self, rhs)))),
-            external_parameters,
-            dependencies,
-            ..Default::default()
-        }
-    }
-}
-
-impl<'a> Add for &'a Amplitude<'a> {
-    type Output = Amplitude<'a>;
-    fn add(self, rhs: Self) -> Self::Output {
-        Amplitude {
-            op: Some(Arc::new(RwLock::new(Operation::Add(
-                self.clone(),
-                rhs.clone(),
-            )))),
-            external_parameters: Arc::new(RwLock::new(
-                self.external_parameters
-                    .read()
-                    .clone()
-                    .into_iter()
-                    .chain(rhs.external_parameters.read().clone())
-                    .collect(),
-            )),
-            dependencies: match (self.clone().dependencies, rhs.clone().dependencies) {
-                (Some(deps_a), Some(deps_b)) => Some(deps_a.into_iter().chain(deps_b).collect()),
-                (Some(deps), None) | (None, Some(deps)) => Some(deps),
-                (None, None) => None,
-            },
-            ..Default::default()
-        }
-    }
-}
-impl<'a> Add<&'a Amplitude<'a>> for Amplitude<'a> {
-    type Output = Amplitude<'a>;
-    fn add(self, rhs: &'a Self) -> Self::Output {
-        Amplitude {
-            op: Some(Arc::new(RwLock::new(Operation::Add(
-                self.clone(),
-                rhs.clone(),
-            )))),
-            external_parameters: Arc::new(RwLock::new(
-                self.external_parameters
-                    .read()
-                    .clone()
-                    .into_iter()
-                    .chain(rhs.external_parameters.read().clone())
-                    .collect(),
-            )),
-            dependencies: match (self.clone().dependencies, rhs.clone().dependencies) {
-                (Some(deps_a), Some(deps_b)) => Some(deps_a.into_iter().chain(deps_b).collect()),
-                (Some(deps), None) | (None, Some(deps)) => Some(deps),
-                (None, None) => None,
-            },
-            ..Default::default()
-        }
-    }
-}
-
-impl<'a> Sub for Amplitude<'a> {
-    type Output = Amplitude<'a>;
-
-    fn sub(self, rhs: Amplitude<'a>) -> Self::Output {
-        let external_parameters = Arc::new(RwLock::new(
-            self.external_parameters
-                .read()
-                .clone()
-                .into_iter()
-                .chain(rhs.external_parameters.read().clone())
-                .collect(),
-        ));
-
-        let dependencies = match (self.dependencies.clone(), rhs.dependencies.clone()) {
-            (Some(deps_a), Some(deps_b)) => Some(deps_a.into_iter().chain(deps_b).collect()),
-            (Some(deps), None) | (None, Some(deps)) => Some(deps),
-            (None, None) => None,
-        };
-
-        Amplitude {
-            op: Some(Arc::new(RwLock::new(Operation::Sub(self, rhs)))),
-            external_parameters,
-            dependencies,
-            ..Default::default()
-        }
-    }
-}
 
-impl<'a> Sub for &'a Amplitude<'a> {
-    type Output = Amplitude<'a>;
-    fn sub(self, rhs: Self) -> Self::Output {
+    /// Wraps `amplitude` in a single-argument [`Operation`], sharing its external parameters.
+    fn unary_op(amplitude: Amplitude<'a>, op: fn(Amplitude<'a>) -> Operation<'a>) -> Amplitude<'a> {
         Amplitude {
-            op: Some(Arc::new(RwLock::new(Operation::Sub(
-                self.clone(),
-                rhs.clone(),
-            )))),
-
-            external_parameters: Arc::new(RwLock::new(
-                self.external_parameters
-                    .read()
-                    .clone()
-                    .into_iter()
-                    .chain(rhs.external_parameters.read().clone())
-                    .collect(),
-            )),
-
-            dependencies: match (self.clone().dependencies, rhs.clone().dependencies) {
-                (Some(deps_a), Some(deps_b)) => Some(deps_a.into_iter().chain(deps_b).collect()),
-                (Some(deps), None) | (None, Some(deps)) => Some(deps),
-                (None, None) => None,
-            },
+            external_parameters: amplitude.external_parameters.clone(),
+            dependencies: amplitude.dependencies.clone(),
+            op: Some(Arc::new(op(amplitude))),
             ..Default::default()
         }
     }
-}
-impl<'a> Sub<&'a Amplitude<'a>> for Amplitude<'a> {
-    type Output = Amplitude<'a>;
-    fn sub(self, rhs: &'a Self) -> Self::Output {
-        Amplitude {
-            op: Some(Arc::new(RwLock::new(Operation::Sub(
-                self.clone(),
-                rhs.clone(),
-            )))),
-
-            external_parameters: Arc::new(RwLock::new(
-                self.external_parameters
-                    .read()
-                    .clone()
-                    .into_iter()
-                    .chain(rhs.external_parameters.read().clone())
-                    .collect(),
-            )),
 
-            dependencies: match (self.clone().dependencies, rhs.clone().dependencies) {
-                (Some(deps_a), Some(deps_b)) => Some(deps_a.into_iter().chain(deps_b).collect()),
-                (Some(deps), None) | (None, Some(deps)) => Some(deps),
-                (None, None) => None,
-            },
-            ..Default::default()
-        }
-    }
-}
-
-impl<'a> Mul for Amplitude<'a> {
-    type Output = Amplitude<'a>;
-
-    fn mul(self, rhs: Amplitude<'a>) -> Self::Output {
+    /// Joins two amplitudes with a two-argument [`Operation`], merging their external parameters
+    /// and dependencies.
+    fn binary_op(
+        lhs: Amplitude<'a>,
+        rhs: Amplitude<'a>,
+        op: fn(Amplitude<'a>, Amplitude<'a>) -> Operation<'a>,
+    ) -> Amplitude<'a> {
         let external_parameters = Arc::new(RwLock::new(
-            self.external_parameters
+            lhs.external_parameters
                 .read()
                 .clone()
                 .into_iter()
                 .chain(rhs.external_parameters.read().clone())
                 .collect(),
         ));
-        let dependencies = match (self.dependencies.clone(), rhs.dependencies.clone()) {
+        let dependencies = match (lhs.dependencies.clone(), rhs.dependencies.clone()) {
             (Some(deps_a), Some(deps_b)) => Some(deps_a.into_iter().chain(deps_b).collect()),
             (Some(deps), None) | (None, Some(deps)) => Some(deps),
             (None, None) => None,
         };
-
         Amplitude {
-            op: Some(Arc::new(RwLock::new(Operation::Mul(self, rhs)))),
+            op: Some(Arc::new(op(lhs, rhs))),
             external_parameters,
             dependencies,
             ..Default::default()
@@ -535,236 +483,45 @@ impl<'a> Mul for Amplitude<'a> {
     }
 }
 
-impl<'a> Mul for &'a Amplitude<'a> {
-    type Output = Amplitude<'a>;
-    fn mul(self, rhs: Self) -> Self::Output {
-        Amplitude {
-            op: Some(Arc::new(RwLock::new(Operation::Mul(
-                self.clone(),
-                rhs.clone(),
-            )))),
-            external_parameters: Arc::new(RwLock::new(
-                self.external_parameters
-                    .read()
-                    .clone()
-                    .into_iter()
-                    .chain(rhs.external_parameters.read().clone())
-                    .collect(),
-            )),
-
-            dependencies: match (self.clone().dependencies, rhs.clone().dependencies) {
-                (Some(deps_a), Some(deps_b)) => Some(deps_a.into_iter().chain(deps_b).collect()),
-                (Some(deps), None) | (None, Some(deps)) => Some(deps),
-                (None, None) => None,
-            },
-            ..Default::default()
-        }
-    }
-}
-impl<'a> Mul<&'a Amplitude<'a>> for Amplitude<'a> {
-    type Output = Amplitude<'a>;
-    fn mul(self, rhs: &'a Self) -> Self::Output {
-        Amplitude {
-            op: Some(Arc::new(RwLock::new(Operation::Mul(
-                self.clone(),
-                rhs.clone(),
-            )))),
-            external_parameters: Arc::new(RwLock::new(
-                self.external_parameters
-                    .read()
-                    .clone()
-                    .into_iter()
-                    .chain(rhs.external_parameters.read().clone())
-                    .collect(),
-            )),
-
-            dependencies: match (self.clone().dependencies, rhs.clone().dependencies) {
-                (Some(deps_a), Some(deps_b)) => Some(deps_a.into_iter().chain(deps_b).collect()),
-                (Some(deps), None) | (None, Some(deps)) => Some(deps),
-                (None, None) => None,
-            },
-            ..Default::default()
-        }
-    }
-}
-impl<'a> Div for Amplitude<'a> {
-    type Output = Amplitude<'a>;
-
-    fn div(self, rhs: Amplitude<'a>) -> Self::Output {
-        let external_parameters = Arc::new(RwLock::new(
-            self.external_parameters
-                .read()
-                .clone()
-                .into_iter()
-                .chain(rhs.external_parameters.read().clone())
-                .collect(),
-        ));
-        let dependencies = match (self.dependencies.clone(), rhs.dependencies.clone()) {
-            (Some(deps_a), Some(deps_b)) => Some(deps_a.into_iter().chain(deps_b).collect()),
-            (Some(deps), None) | (None, Some(deps)) => Some(deps),
-            (None, None) => None,
-        };
-
-        Amplitude {
-            op: Some(Arc::new(RwLock::new(Operation::Div(self, rhs)))),
-            external_parameters,
-            dependencies,
-            ..Default::default()
-        }
-    }
-}
-impl<'a> Div for &'a Amplitude<'a> {
-    type Output = Amplitude<'a>;
-    fn div(self, rhs: Self) -> Self::Output {
-        Amplitude {
-            op: Some(Arc::new(RwLock::new(Operation::Div(
-                self.clone(),
-                rhs.clone(),
-            )))),
-            external_parameters: Arc::new(RwLock::new(
-                self.external_parameters
-                    .read()
-                    .clone()
-                    .into_iter()
-                    .chain(rhs.external_parameters.read().clone())
-                    .collect(),
-            )),
-
-            dependencies: match (self.clone().dependencies, rhs.clone().dependencies) {
-                (Some(deps_a), Some(deps_b)) => Some(deps_a.into_iter().chain(deps_b).collect()),
-                (Some(deps), None) | (None, Some(deps)) => Some(deps),
-                (None, None) => None,
-            },
-            ..Default::default()
-        }
-    }
-}
-impl<'a> Div<&'a Amplitude<'a>> for Amplitude<'a> {
-    type Output = Amplitude<'a>;
-    fn div(self, rhs: &'a Self) -> Self::Output {
-        Amplitude {
-            op: Some(Arc::new(RwLock::new(Operation::Div(
-                self.clone(),
-                rhs.clone(),
-            )))),
-            external_parameters: Arc::new(RwLock::new(
-                self.external_parameters
-                    .read()
-                    .clone()
-                    .into_iter()
-                    .chain(rhs.external_parameters.read().clone())
-                    .collect(),
-            )),
-
-            dependencies: match (self.clone().dependencies, rhs.clone().dependencies) {
-                (Some(deps_a), Some(deps_b)) => Some(deps_a.into_iter().chain(deps_b).collect()),
-                (Some(deps), None) | (None, Some(deps)) => Some(deps),
-                (None, None) => None,
-            },
-            ..Default::default()
+macro_rules! impl_binary_op {
+    ($trait:ident, $method:ident, $variant:ident) => {
+        impl<'a> $trait<Amplitude<'a>> for Amplitude<'a> {
+            type Output = Amplitude<'a>;
+            fn $method(self, rhs: Amplitude<'a>) -> Self::Output {
+                Amplitude::binary_op(self, rhs, Operation::$variant)
+            }
         }
-    }
-}
-
-impl<'a> num_traits::pow::Pow<Amplitude<'a>> for Amplitude<'a> {
-    type Output = Amplitude<'a>;
-
-    fn pow(self, rhs: Amplitude<'a>) -> Self::Output {
-        let external_parameters = Arc::new(RwLock::new(
-            self.external_parameters
-                .read()
-                .clone()
-                .into_iter()
-                .chain(rhs.external_parameters.read().clone())
-                .collect(),
-        ));
-        let dependencies = match (self.dependencies.clone(), rhs.dependencies.clone()) {
-            (Some(deps_a), Some(deps_b)) => Some(deps_a.into_iter().chain(deps_b).collect()),
-            (Some(deps), None) | (None, Some(deps)) => Some(deps),
-            (None, None) => None,
-        };
-
-        Amplitude {
-            op: Some(Arc::new(RwLock::new(Operation::Pow(self, rhs)))),
-            external_parameters,
-            dependencies,
-            ..Default::default()
+        impl<'a> $trait<&'a Amplitude<'a>> for &'a Amplitude<'a> {
+            type Output = Amplitude<'a>;
+            fn $method(self, rhs: &'a Amplitude<'a>) -> Self::Output {
+                Amplitude::binary_op(self.clone(), rhs.clone(), Operation::$variant)
+            }
         }
-    }
-}
-impl<'a> num_traits::pow::Pow<Self> for &'a Amplitude<'a> {
-    type Output = Amplitude<'a>;
-    fn pow(self, rhs: Self) -> Self::Output {
-        Amplitude {
-            op: Some(Arc::new(RwLock::new(Operation::Pow(
-                self.clone(),
-                rhs.clone(),
-            )))),
-            external_parameters: Arc::new(RwLock::new(
-                self.external_parameters
-                    .read()
-                    .clone()
-                    .into_iter()
-                    .chain(rhs.external_parameters.read().clone())
-                    .collect(),
-            )),
-
-            dependencies: match (self.clone().dependencies, rhs.clone().dependencies) {
-                (Some(deps_a), Some(deps_b)) => Some(deps_a.into_iter().chain(deps_b).collect()),
-                (Some(deps), None) | (None, Some(deps)) => Some(deps),
-                (None, None) => None,
-            },
-            ..Default::default()
+        impl<'a> $trait<&'a Amplitude<'a>> for Amplitude<'a> {
+            type Output = Amplitude<'a>;
+            fn $method(self, rhs: &'a Amplitude<'a>) -> Self::Output {
+                Amplitude::binary_op(self, rhs.clone(), Operation::$variant)
+            }
         }
-    }
+    };
 }
-impl<'a> num_traits::pow::Pow<&'a Amplitude<'a>> for Amplitude<'a> {
-    type Output = Amplitude<'a>;
-    fn pow(self, rhs: &'a Self) -> Self::Output {
-        Amplitude {
-            op: Some(Arc::new(RwLock::new(Operation::Pow(
-                self.clone(),
-                rhs.clone(),
-            )))),
-            external_parameters: Arc::new(RwLock::new(
-                self.external_parameters
-                    .read()
-                    .clone()
-                    .into_iter()
-                    .chain(rhs.external_parameters.read().clone())
-                    .collect(),
-            )),
 
-            dependencies: match (self.clone().dependencies, rhs.clone().dependencies) {
-                (Some(deps_a), Some(deps_b)) => Some(deps_a.into_iter().chain(deps_b).collect()),
-                (Some(deps), None) | (None, Some(deps)) => Some(deps),
-                (None, None) => None,
-            },
-            ..Default::default()
-        }
-    }
-}
+impl_binary_op!(Add, add, Add);
+impl_binary_op!(Sub, sub, Sub);
+impl_binary_op!(Mul, mul, Mul);
+impl_binary_op!(Div, div, Div);
+impl_binary_op!(Pow, pow, Pow);
 
 impl<'a> Neg for &'a Amplitude<'a> {
     type Output = Amplitude<'a>;
     fn neg(self) -> Self::Output {
-        Amplitude {
-            op: Some(Arc::new(RwLock::new(Operation::Neg(self.clone())))),
-            external_parameters: self.clone().external_parameters,
-            dependencies: self.clone().dependencies,
-            ..Default::default()
-        }
+        Amplitude::unary_op(self.clone(), Operation::Neg)
     }
 }
 impl<'a> Neg for Amplitude<'a> {
     type Output = Amplitude<'a>;
     fn neg(self) -> Self::Output {
-        Amplitude {
-            op: Some(Arc::new(RwLock::new(Operation::Neg(self.clone())))),
-            external_parameters: self.clone().external_parameters,
-            dependencies: self.clone().dependencies,
-            ..Default::default()
-        }
+        Amplitude::unary_op(self, Operation::Neg)
     }
 }
 
@@ -865,7 +622,7 @@ impl Variable {
     {
         Variable {
             name: Arc::new(name.to_string()),
-            function: Arc::new(RwLock::new(function)),
+            function: Arc::new(function),
             dependencies,
         }
     }
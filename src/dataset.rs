@@ -1,5 +1,9 @@
+#[cfg(feature = "parquet")]
 use std::fs::File;
+#[cfg(feature = "parquet")]
+use std::path::Path;
 
+#[cfg(feature = "parquet")]
 use polars::prelude::*;
 use rayon::prelude::*;
 use rustc_hash::FxHashMap as HashMap;
@@ -51,9 +55,44 @@ impl Dataset {
             prunable,
         }
     }
-    pub fn add_field(&mut self, name: &str, field: &[FieldType], prunable: bool) {
-        for (i, entry) in &mut self.entries.iter_mut().enumerate() {
-            entry.insert(name.to_string(), field[i].clone());
+    pub fn add_field<I>(&mut self, name: &str, field: I, prunable: bool)
+    where
+        I: IntoIterator<Item = FieldType>,
+        I::IntoIter: ExactSizeIterator,
+    {
+        //! Adds a field with the given name to every entry, in order.
+        //!
+        //! # Panics
+        //! Panics if `field` does not yield exactly one value per entry in the dataset.
+        //!
+        //! # Examples
+        //!
+        //! Any iterator with a known length can be used, not just a [`Vec`]:
+        //!
+        //! ```
+        //! use rustitude::prelude::*;
+        //!
+        //! let mut d: Dataset = Dataset::new(3);
+        //! d.add_field("x", (0..3).map(|i| FieldType::Scalar(i as f64)), false);
+        //! assert_eq!(*d.entries[2]["x"].scalar_ref().unwrap(), 2.0);
+        //! ```
+        //!
+        //! A field with the wrong number of values panics:
+        //!
+        //! ```should_panic
+        //! use rustitude::prelude::*;
+        //!
+        //! let mut d: Dataset = Dataset::new(3);
+        //! d.add_field("x", vec![FieldType::Scalar(1.0); 2], false);
+        //! ```
+        let field = field.into_iter();
+        assert_eq!(
+            field.len(),
+            self.entries.len(),
+            "field {name} has a different length than the dataset"
+        );
+        for (entry, value) in self.entries.iter_mut().zip(field) {
+            entry.insert(name.to_string(), value);
         }
         self.prunable.insert(name.to_string(), prunable);
     }
@@ -86,11 +125,11 @@ impl Dataset {
             }
         }
         // then resolve the variable itself
-        let fn_lock = variable.function.read();
+        let function = &variable.function;
         if !self.prunable.contains_key(&*variable.name) {
             #[allow(clippy::redundant_closure)]
-            let field: Vec<FieldType> = self.entries.iter().map(|entry| fn_lock(entry)).collect();
-            self.add_field(&variable.name, &field, prunable);
+            let field: Vec<FieldType> = self.entries.iter().map(|entry| function(entry)).collect();
+            self.add_field(&variable.name, field, prunable);
         }
     }
     pub fn par_resolve_dependencies(&mut self, variable: Variable, prunable: bool) {
@@ -103,21 +142,22 @@ impl Dataset {
             }
         }
         // then resolve the variable itself
-        let fn_lock = variable.function.read();
+        let function = &variable.function;
         if !self.prunable.contains_key(&*variable.name) {
             #[allow(clippy::redundant_closure)]
             let field: Vec<FieldType> = self
                 .entries
                 .par_iter()
-                .map(|entry| fn_lock(entry))
+                .map(|entry| function(entry))
                 .collect();
-            self.add_field(&variable.name, &field, prunable);
+            self.add_field(&variable.name, field, prunable);
         }
     }
 }
 
-pub fn open_parquet(path: &str) -> Result<DataFrame, PolarsError> {
-    //! Opens a parquet file from a path string
+#[cfg(feature = "parquet")]
+pub fn open_parquet<P: AsRef<Path>>(path: P) -> Result<DataFrame, PolarsError> {
+    //! Opens a parquet file from a path
     //!
     //! # Errors
     //! Returns an error if the result isn't readable as a parquet file or if the file is not found.
@@ -125,6 +165,23 @@ pub fn open_parquet(path: &str) -> Result<DataFrame, PolarsError> {
     ParquetReader::new(file).finish()
 }
 
+#[cfg(feature = "parquet")]
+pub fn open_parquet_columns<P: AsRef<Path>>(
+    path: P,
+    columns: &[&str],
+) -> Result<DataFrame, PolarsError> {
+    //! Opens a parquet file from a path, only reading the given columns
+    //!
+    //! # Errors
+    //! Returns an error if the result isn't readable as a parquet file, if the file is not found,
+    //! or if any of the requested columns are missing.
+    let file = File::open(path)?;
+    ParquetReader::new(file)
+        .with_columns(Some(columns.iter().map(|s| (*s).to_string()).collect()))
+        .finish()
+}
+
+#[cfg(feature = "parquet")]
 #[derive(Clone, Copy)]
 pub enum PolarsTypeConversion {
     F32ToScalar,
@@ -132,6 +189,7 @@ pub enum PolarsTypeConversion {
     ListToVector,
 }
 
+#[cfg(feature = "parquet")]
 pub fn extract_field(
     column_name: &str,
     column_type: PolarsTypeConversion,
@@ -142,42 +200,34 @@ pub fn extract_field(
     //!
     //! # Panics
     //!
-    //! Currently will panic if the branch/column name was not found in the
-    //! [`polars::prelude::DataFrame`]
+    //! Currently will panic if the column contains null values.
     //!
     //! # Errors
     //!
-    //! Returns [`PolarsError`] if any step in the conversion fails.
-    let series = df
-        .column(column_name)
-        .unwrap_or_else(|_| panic!("No branch {column_name}"));
+    //! Returns [`PolarsError`] if the branch/column name was not found in the
+    //! [`polars::prelude::DataFrame`] or if any step in the conversion fails.
+    let series = df.column(column_name)?;
     match column_type {
-        PolarsTypeConversion::F32ToScalar => Ok(series
-            .f32()?
-            .to_vec()
-            .into_iter()
-            .map(|x| FieldType::Scalar(x.unwrap().into()))
-            .collect::<Vec<FieldType>>()),
-        PolarsTypeConversion::F64ToScalar => Ok(series
-            .f64()?
-            .to_vec()
-            .into_iter()
-            .map(|x| FieldType::Scalar(x.unwrap()))
-            .collect::<Vec<FieldType>>()),
-        PolarsTypeConversion::ListToVector => Ok(series
-            .list()?
-            .into_iter()
-            .map(|x| {
-                FieldType::Vector(Array1::from_vec(
-                    x.unwrap()
-                        .f32()
-                        .unwrap()
-                        .to_vec()
-                        .into_iter()
-                        .map(|x| x.unwrap().into())
-                        .collect(),
-                ))
-            })
-            .collect::<Vec<FieldType>>()),
+        PolarsTypeConversion::F32ToScalar | PolarsTypeConversion::F64ToScalar => {
+            // cast the whole column once so f32 and f64 scalars take the same path below
+            let scalars = series.cast(&DataType::Float64)?;
+            Ok(scalars
+                .f64()?
+                .into_iter()
+                .map(|x| FieldType::Scalar(x.unwrap()))
+                .collect::<Vec<FieldType>>())
+        }
+        PolarsTypeConversion::ListToVector => {
+            // cast the whole column once so f32 and f64 lists take the same path below
+            let lists = series.cast(&DataType::List(Box::new(DataType::Float64)))?;
+            Ok(lists
+                .list()?
+                .into_iter()
+                .map(|x| {
+                    let x = x.unwrap();
+                    FieldType::Vector(x.f64().unwrap().into_iter().map(|x| x.unwrap()).collect())
+                })
+                .collect::<Vec<FieldType>>())
+        }
     }
 }
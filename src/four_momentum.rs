@@ -108,31 +108,44 @@ impl FourMomentum {
         //! ```
         //! where
         //! $`\overrightarrow{\beta} = \frac{\overrightarrow{p}}{E}`$ and $`\gamma = \frac{1}{\sqrt{1 - \overrightarrow{\beta}^2}}`$.
+        //!
+        //! A [`FourMomentum`] at rest gives the identity matrix.
+        //!
+        //! # Examples
+        //! ```
+        //! use rustitude::prelude::*;
+        //! use ndarray::Array2;
+        //!
+        //! let at_rest = FourMomentum::new(0.938, 0.0, 0.0, 0.0);
+        //! assert_eq!(at_rest.boost_matrix(), Array2::<f64>::eye(4));
+        //! ```
         let b = self.beta3();
         let b2 = b.dot(&b);
         let g = 1.0 / (1.0 - b2).sqrt();
-        let out = array![
+        // (gamma - 1) / beta^2 is computed once; at rest every spatial term it multiplies vanishes,
+        // so take it to be zero rather than dividing 0 by 0
+        let k = if b2 > 0.0 { (g - 1.0) / b2 } else { 0.0 };
+        array![
             [g, -g * b[0], -g * b[1], -g * b[2]],
             [
                 -g * b[0],
-                1.0 + (g - 1.0) * b[0] * b[0] / b2,
-                (g - 1.0) * b[0] * b[1] / b2,
-                (g - 1.0) * b[0] * b[2] / b2
+                1.0 + k * b[0] * b[0],
+                k * b[0] * b[1],
+                k * b[0] * b[2]
             ],
             [
                 -g * b[1],
-                (g - 1.0) * b[1] * b[0] / b2,
-                1.0 + (g - 1.0) * b[1] * b[1] / b2,
-                (g - 1.0) * b[1] * b[2] / b2
+                k * b[1] * b[0],
+                1.0 + k * b[1] * b[1],
+                k * b[1] * b[2]
             ],
             [
                 -g * b[2],
-                (g - 1.0) * b[2] * b[0] / b2,
-                (g - 1.0) * b[2] * b[1] / b2,
-                1.0 + (g - 1.0) * b[2] * b[2] / b2
+                k * b[2] * b[0],
+                k * b[2] * b[1],
+                1.0 + k * b[2] * b[2]
             ]
-        ];
-        out
+        ]
     }
 
     pub fn boost_along(&self, other: &Self) -> Self {
@@ -1,75 +1,103 @@
 use std::f64::consts::PI;
+#[cfg(feature = "parquet")]
+use std::path::Path;
 
 use nalgebra::Vector3;
+#[cfg(feature = "parquet")]
+use ndarray::array;
 use ndarray::{Array1, Array2, Array3, Axis};
 use ndarray_linalg::Inverse;
 use num_complex::Complex64;
+#[cfg(feature = "parquet")]
 use polars::error::PolarsError;
+#[cfg(feature = "parquet")]
+use rayon::prelude::*;
 use sphrs::{ComplexSH, Coordinates, SHEval};
 
-use crate::dataset::{extract_field, open_parquet, PolarsTypeConversion};
+#[cfg(feature = "parquet")]
+use crate::dataset::{extract_field, open_parquet_columns, PolarsTypeConversion};
 use crate::prelude::*;
 
-/// Open a `GlueX` ROOT data file (flat tree) by `path`. `polarized` is a flag which is `true` if the
-/// data file has polarization information included in the `"Px_Beam"` and `"Py_Beam"` branches.
+/// The branches read from a `GlueX` flat tree by [`open_gluex`].
+#[cfg(feature = "parquet")]
+const GLUEX_BRANCHES: [&str; 10] = [
+    "NumFinalState",
+    "E_Beam",
+    "Px_Beam",
+    "Py_Beam",
+    "Pz_Beam",
+    "Weight",
+    "E_FinalState",
+    "Px_FinalState",
+    "Py_FinalState",
+    "Pz_FinalState",
+];
+
+/// Open a `GlueX` ROOT data file (flat tree) by `path`, which may be anything that converts to a
+/// [`Path`]. `polarized` is a flag which is `true` if the data file has polarization information
+/// included in the `"Px_Beam"` and `"Py_Beam"` branches.
 ///
 /// # Panics
 ///
-/// Panics if it can't find any of the required branches, or if they contain data with an
-/// unexpected type.
+/// Panics if the tree is empty or if any branch contains null values.
 ///
 /// # Errors
 ///
-/// Will raise [`PolarsError`] in the event that any of the branches aren't read or converted
-/// properly.
-pub fn open_gluex(path: &str, polarized: bool) -> Result<Dataset, PolarsError> {
-    let dataframe = open_parquet(path).expect("Read error");
-    let col_n_fs = dataframe.column("NumFinalState").unwrap();
+/// Will raise [`PolarsError`] in the event that the file can't be read or any of the branches are
+/// missing or can't be converted properly.
+#[cfg(feature = "parquet")]
+pub fn open_gluex<P: AsRef<Path>>(path: P, polarized: bool) -> Result<Dataset, PolarsError> {
+    // polarized files store the polarization in Px/Py and the beam along z, so Pz is never read
+    let branches: Vec<&str> = GLUEX_BRANCHES
+        .into_iter()
+        .filter(|branch| !(polarized && *branch == "Pz_Beam"))
+        .collect();
+    let dataframe = open_parquet_columns(path, &branches)?;
+    let col_n_fs = dataframe.column("NumFinalState")?;
     let mut dataset = Dataset::new(col_n_fs.len());
     #[allow(clippy::cast_sign_loss)]
-    let n_fs = col_n_fs.i32().unwrap().into_iter().next().unwrap().unwrap() as usize;
+    let n_fs = col_n_fs.i32()?.into_iter().next().unwrap().unwrap() as usize;
     let e_beam = extract_field("E_Beam", PolarsTypeConversion::F32ToScalar, &dataframe)?;
     let px_beam = extract_field("Px_Beam", PolarsTypeConversion::F32ToScalar, &dataframe)?;
     let py_beam = extract_field("Py_Beam", PolarsTypeConversion::F32ToScalar, &dataframe)?;
-    let pz_beam = extract_field("Pz_Beam", PolarsTypeConversion::F32ToScalar, &dataframe)?;
-    let mut beam_p4: Vec<FieldType> = Vec::new();
-    let mut eps: Vec<FieldType> = Vec::new();
     if polarized {
-        for (((e, px), py), _) in e_beam
-            .into_iter()
-            .zip(px_beam.into_iter())
-            .zip(py_beam.into_iter())
-            .zip(pz_beam.into_iter())
-        {
-            beam_p4.push(FieldType::Momentum(FourMomentum::new(
-                e.clone().scalar().unwrap(),
-                0.0,
-                0.0,
-                e.scalar().unwrap(),
-            )));
-            eps.push(FieldType::Vector(Array1::from_vec(vec![
-                px.scalar().unwrap(),
-                py.scalar().unwrap(),
-                0.0,
-            ])));
-        }
-        dataset.add_field("Beam P4", &beam_p4, false);
-        dataset.add_field("EPS", &eps, false);
+        let beam_p4: Vec<FieldType> = e_beam
+            .iter()
+            .map(|e| {
+                let e = *e.scalar_ref().unwrap();
+                FieldType::Momentum(FourMomentum::new(e, 0.0, 0.0, e))
+            })
+            .collect();
+        let eps: Vec<FieldType> = px_beam
+            .iter()
+            .zip(py_beam.iter())
+            .map(|(px, py)| {
+                FieldType::Vector(array![
+                    *px.scalar_ref().unwrap(),
+                    *py.scalar_ref().unwrap(),
+                    0.0
+                ])
+            })
+            .collect();
+        dataset.add_field("Beam P4", beam_p4, false);
+        dataset.add_field("EPS", eps, false);
     } else {
-        for (((e, px), py), pz) in e_beam
-            .into_iter()
-            .zip(px_beam.into_iter())
-            .zip(py_beam.into_iter())
-            .zip(pz_beam.into_iter())
-        {
-            beam_p4.push(FieldType::Momentum(FourMomentum::new(
-                e.scalar().unwrap(),
-                px.scalar().unwrap(),
-                py.scalar().unwrap(),
-                pz.scalar().unwrap(),
-            )));
-        }
-        dataset.add_field("Beam P4", &beam_p4, false);
+        let pz_beam = extract_field("Pz_Beam", PolarsTypeConversion::F32ToScalar, &dataframe)?;
+        let beam_p4: Vec<FieldType> = e_beam
+            .iter()
+            .zip(px_beam.iter())
+            .zip(py_beam.iter())
+            .zip(pz_beam.iter())
+            .map(|(((e, px), py), pz)| {
+                FieldType::Momentum(FourMomentum::new(
+                    *e.scalar_ref().unwrap(),
+                    *px.scalar_ref().unwrap(),
+                    *py.scalar_ref().unwrap(),
+                    *pz.scalar_ref().unwrap(),
+                ))
+            })
+            .collect();
+        dataset.add_field("Beam P4", beam_p4, false);
     }
     let weight = extract_field("Weight", PolarsTypeConversion::F32ToScalar, &dataframe)?;
     let e_finalstate = extract_field(
@@ -92,26 +120,27 @@ pub fn open_gluex(path: &str, polarized: bool) -> Result<Dataset, PolarsError> {
         PolarsTypeConversion::ListToVector,
         &dataframe,
     )?;
-    dataset.add_field("Weight", &weight, false);
+    dataset.add_field("Weight", weight, false);
     let fs_p4: Vec<FieldType> = e_finalstate
-        .iter()
-        .zip(px_finalstate.iter())
-        .zip(py_finalstate.iter())
-        .zip(pz_finalstate.iter())
+        .par_iter()
+        .zip(px_finalstate.par_iter())
+        .zip(py_finalstate.par_iter())
+        .zip(pz_finalstate.par_iter())
         .map(|(((e, px), py), pz)| {
-            let mut momentum_vec = Vec::new();
-            for i in 0..n_fs {
-                momentum_vec.push(FourMomentum::new(
-                    e.clone().vector().unwrap()[i],
-                    px.clone().vector().unwrap()[i],
-                    py.clone().vector().unwrap()[i],
-                    pz.clone().vector().unwrap()[i],
-                ));
-            }
-            FieldType::MomentumVec(momentum_vec)
+            let (e, px, py, pz) = (
+                e.vector_ref().unwrap(),
+                px.vector_ref().unwrap(),
+                py.vector_ref().unwrap(),
+                pz.vector_ref().unwrap(),
+            );
+            FieldType::MomentumVec(
+                (0..n_fs)
+                    .map(|i| FourMomentum::new(e[i], px[i], py[i], pz[i]))
+                    .collect(),
+            )
         })
         .collect();
-    dataset.add_field("Final State P4", &fs_p4, false);
+    dataset.add_field("Final State P4", fs_p4, false);
     Ok(dataset)
 }
 
@@ -201,16 +230,14 @@ pub struct Zlm {
 }
 impl VariableBuilder for Zlm {
     fn into_variable(self) -> Variable {
+        // the reflectivity only flips which component gets the (1 + P_gamma) factor, so resolve it
+        // to a sign here instead of matching on it for every event
+        let (r_label, r_sign) = match self.r {
+            Reflectivity::Positive => ("+", 1.0),
+            Reflectivity::Negative => ("-", -1.0),
+        };
         Variable::new(
-            &format!(
-                "Z {} {} {}",
-                self.l,
-                self.m,
-                match self.r {
-                    Reflectivity::Positive => "+",
-                    Reflectivity::Negative => "-",
-                }
-            ),
+            &format!("Z {} {} {}", self.l, self.m, r_label),
             move |entry: &VarMap| {
                 let beam_p4_lab = entry["Beam P4"].momentum_ref().unwrap();
                 let fs_p4s_lab = entry["Final State P4"].momenta_ref().unwrap();
@@ -250,7 +277,8 @@ impl VariableBuilder for Zlm {
                 let ylm = ComplexSH::Spherical.eval(self.l as i64, self.m as i64, &p);
 
                 // Polarization
-                let eps = Vector3::from_vec(entry["EPS"].vector_ref().unwrap().to_vec());
+                let eps = entry["EPS"].vector_ref().unwrap();
+                let eps = Vector3::new(eps[0], eps[1], eps[2]);
                 let big_phi = y
                     .dot(&eps)
                     .atan2(beam_p4.momentum().normalize().dot(&eps.cross(&y)));
@@ -259,17 +287,10 @@ impl VariableBuilder for Zlm {
 
                 let zlm = ylm * phase;
 
-                let res = match self.r {
-                    Reflectivity::Positive => Complex64 {
-                        re: (1.0 + pgamma).sqrt() * zlm.re,
-                        im: (1.0 - pgamma).sqrt() * zlm.im,
-                    },
-                    Reflectivity::Negative => Complex64 {
-                        re: (1.0 - pgamma).sqrt() * zlm.re,
-                        im: (1.0 + pgamma).sqrt() * zlm.im,
-                    },
-                };
-                FieldType::CScalar(res)
+                FieldType::CScalar(Complex64 {
+                    re: (1.0 + r_sign * pgamma).sqrt() * zlm.re,
+                    im: (1.0 - r_sign * pgamma).sqrt() * zlm.im,
+                })
             },
             None,
         )
@@ -363,11 +384,13 @@ impl BarrierFactor {
 
 impl BarrierFactor {
     fn chi_plus(&self, s: f64, channel: usize) -> Complex64 {
-        (1.0 - ((&self.m1 + &self.m2) * (&self.m1 + &self.m2))[channel] / s).into()
+        let m_sum = self.m1[channel] + self.m2[channel];
+        (1.0 - m_sum * m_sum / s).into()
     }
 
     fn chi_minus(&self, s: f64, channel: usize) -> Complex64 {
-        (1.0 - ((&self.m1 - &self.m2) * (&self.m1 - &self.m2))[channel] / s).into()
+        let m_diff = self.m1[channel] - self.m2[channel];
+        (1.0 - m_diff * m_diff / s).into()
     }
 
     fn rho(&self, s: f64, channel: usize) -> Complex64 {
@@ -391,23 +414,25 @@ impl BarrierFactor {
             l => panic!("L = {l} is not yet implemented"),
         }
     }
-    fn barrier_factor(&self, s: f64, channel: usize, resonance: usize) -> Complex64 {
-        let numerator = self.blatt_weisskopf(s, channel);
-        let denominator = self.blatt_weisskopf(self.m[resonance].powi(2), channel);
-        numerator / denominator
-    }
 }
 impl VariableBuilder for BarrierFactor {
     fn into_variable(self) -> Variable {
         let mass = self.mass.clone();
         let mass_name = mass.name.clone();
+        // the Blatt-Weisskopf factors at the resonance masses don't depend on the event, so they
+        // are only calculated once here
+        let denominators = Array2::from_shape_fn((self.n_channels, self.n_resonances), |(i, a)| {
+            self.blatt_weisskopf(self.m[a].powi(2), i)
+        });
         Variable::new(
             &self.name.clone(),
             move |entry: &VarMap| {
                 let s = entry[&*mass_name].scalar_ref().unwrap().powi(2);
+                let numerators =
+                    Array1::from_shape_fn(self.n_channels, |i| self.blatt_weisskopf(s, i));
                 FieldType::CMatrix(Array2::from_shape_fn(
                     (self.n_channels, self.n_resonances),
-                    |(i, a)| self.barrier_factor(s, i, a),
+                    |(i, a)| numerators[i] / denominators[[i, a]],
                 ))
             },
             Some(vec![mass]),
@@ -465,11 +490,13 @@ impl FrozenKMatrix {
     }
 
     fn chi_plus(&self, s: f64, channel: usize) -> Complex64 {
-        (1.0 - ((&self.m1 + &self.m2) * (&self.m1 + &self.m2))[channel] / s).into()
+        let m_sum = self.m1[channel] + self.m2[channel];
+        (1.0 - m_sum * m_sum / s).into()
     }
 
     fn chi_minus(&self, s: f64, channel: usize) -> Complex64 {
-        (1.0 - ((&self.m1 - &self.m2) * (&self.m1 - &self.m2))[channel] / s).into()
+        let m_diff = self.m1[channel] - self.m2[channel];
+        (1.0 - m_diff * m_diff / s).into()
     }
 
     fn rho(&self, s: f64, channel: usize) -> Complex64 {
@@ -478,13 +505,13 @@ impl FrozenKMatrix {
 
     fn c_matrix(&self, s: f64) -> Array2<Complex64> {
         Array2::from_diag(&Array1::from_shape_fn(self.n_channels, |channel| {
-            self.rho(s, channel) / PI
-                * ((self.chi_plus(s, channel) + self.rho(s, channel))
-                    / (self.chi_plus(s, channel) - self.rho(s, channel)))
-                .ln()
-                + self.chi_plus(s, channel) / PI
-                    * ((&self.m2 - &self.m1) / (&self.m1 + &self.m2))[channel]
-                    * Complex64::from((&self.m2 / &self.m1)[channel]).ln()
+            let chi_plus = self.chi_plus(s, channel);
+            let rho = (chi_plus * self.chi_minus(s, channel)).sqrt();
+            rho / PI * ((chi_plus + rho) / (chi_plus - rho)).ln()
+                + chi_plus / PI
+                    * ((self.m2[channel] - self.m1[channel])
+                        / (self.m1[channel] + self.m2[channel]))
+                    * Complex64::from(self.m2[channel] / self.m1[channel]).ln()
         }))
     }
 }
@@ -509,6 +536,11 @@ impl VariableBuilder for FrozenKMatrix {
             mass: mass.clone(),
         }
         .into_variable();
+        // the coupling products g_i * g_j do not depend on the event
+        let gg = Array3::from_shape_fn(
+            (self.n_channels, self.n_channels, self.n_resonances),
+            |(i, j, a)| self.g[[i, a]] * self.g[[j, a]],
+        );
 
         Variable::new(
             &self.name.clone(),
@@ -519,8 +551,7 @@ impl VariableBuilder for FrozenKMatrix {
                     (self.n_channels, self.n_channels, self.n_resonances),
                     |(i, j, a)| {
                         bf[[i, a]]
-                            * ((self.g[[i, a]] * self.g[[j, a]]) / (self.m[a].powi(2) - s)
-                                + self.c[[i, j]])
+                            * (gg[[i, j, a]] / (self.m[a].powi(2) - s) + self.c[[i, j]])
                             * bf[[j, a]]
                     },
                 );
@@ -550,6 +581,7 @@ impl<'a> AmplitudeBuilder<'a> for FrozenKMatrix {
         let internal_parameters: Vec<String> = (0..self.n_resonances)
             .map(|i| format!("beta_{i}"))
             .collect();
+        let beta_names = internal_parameters.clone();
         let internal_parameters: Vec<&str> = internal_parameters.iter().map(|s| &**s).collect();
         Amplitude::new(
             &var_name.clone(),
@@ -558,7 +590,7 @@ impl<'a> AmplitudeBuilder<'a> for FrozenKMatrix {
                 let bf = vars[&*bf_name].cmatrix_ref().unwrap();
                 let ikc_inv_vec = vars[&*var_name].cvector_ref().unwrap();
                 let betas = Array1::from_shape_fn(self.n_resonances, |i| {
-                    pars[&format!("beta_{i}")].value.cscalar().unwrap()
+                    pars[&beta_names[i]].value.cscalar().unwrap()
                 });
 
                 let p_ja = Array2::from_shape_fn((self.n_channels, self.n_resonances), |(j, a)| {
@@ -573,3 +605,94 @@ impl<'a> AmplitudeBuilder<'a> for FrozenKMatrix {
         )
     }
 }
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    // reference implementations of the K-matrix pieces as they were written before the
+    // event-independent factors were hoisted out of the per-event closures
+    fn ref_chi_plus(m1: &Array1<f64>, m2: &Array1<f64>, s: f64, channel: usize) -> Complex64 {
+        (1.0 - ((m1 + m2) * (m1 + m2))[channel] / s).into()
+    }
+
+    fn ref_chi_minus(m1: &Array1<f64>, m2: &Array1<f64>, s: f64, channel: usize) -> Complex64 {
+        (1.0 - ((m1 - m2) * (m1 - m2))[channel] / s).into()
+    }
+
+    fn ref_rho(m1: &Array1<f64>, m2: &Array1<f64>, s: f64, channel: usize) -> Complex64 {
+        (ref_chi_plus(m1, m2, s, channel) * ref_chi_minus(m1, m2, s, channel)).sqrt()
+    }
+
+    fn ref_blatt_weisskopf_l2(
+        m1: &Array1<f64>,
+        m2: &Array1<f64>,
+        s: f64,
+        channel: usize,
+    ) -> Complex64 {
+        let q = ref_rho(m1, m2, s, channel) * Complex64::sqrt(s.into()) / 2.0;
+        let z = q * q / (0.1973 * 0.1973);
+        ((13.0 * z.powi(2)) / ((z - 3.0).powi(2) + 9.0 * z)).sqrt()
+    }
+
+    fn constants() -> KMatrixConstants {
+        KMatrixConstants {
+            g: ndarray::array![[0.4, 0.2], [0.3, -0.1]],
+            m: ndarray::array![0.99, 1.37],
+            c: ndarray::array![[0.05, -0.02], [-0.02, 0.03]],
+            m1: ndarray::array![0.13498, 0.49368],
+            m2: ndarray::array![0.13498, 0.49761],
+        }
+    }
+
+    fn particle_info() -> ParticleInfo {
+        ParticleInfo {
+            recoil_index: 0,
+            daughter_index: 1,
+            resonance_indices: vec![1, 2],
+        }
+    }
+
+    #[test]
+    fn kmatrix_matches_reference() {
+        let KMatrixConstants { g, m, c, m1, m2 } = constants();
+        let mass = 1.2;
+        let s: f64 = mass * mass;
+
+        let ref_bf = Array2::from_shape_fn((2, 2), |(i, a)| {
+            ref_blatt_weisskopf_l2(&m1, &m2, s, i)
+                / ref_blatt_weisskopf_l2(&m1, &m2, m[a].powi(2), i)
+        });
+        let ref_k = Array3::from_shape_fn((2, 2, 2), |(i, j, a)| {
+            ref_bf[[i, a]]
+                * ((g[[i, a]] * g[[j, a]]) / (m[a].powi(2) - s) + c[[i, j]])
+                * ref_bf[[j, a]]
+        })
+        .sum_axis(Axis(2));
+        let ref_c = Array2::from_diag(&Array1::from_shape_fn(2, |channel| {
+            ref_rho(&m1, &m2, s, channel) / PI
+                * ((ref_chi_plus(&m1, &m2, s, channel) + ref_rho(&m1, &m2, s, channel))
+                    / (ref_chi_plus(&m1, &m2, s, channel) - ref_rho(&m1, &m2, s, channel)))
+                .ln()
+                + ref_chi_plus(&m1, &m2, s, channel) / PI
+                    * ((&m2 - &m1) / (&m1 + &m2))[channel]
+                    * Complex64::from((&m2 / &m1)[channel]).ln()
+        }));
+        let ref_ikc_inv = (Array2::<Complex64>::eye(2) + ref_k * ref_c).inv().unwrap();
+
+        let kmatrix =
+            FrozenKMatrix::new("kmatrix", 1, constants(), 2, particle_info(), None).into_variable();
+        let deps = kmatrix.dependencies.clone().unwrap();
+        let mut entry = VarMap::default();
+        entry.insert(deps[0].name.to_string(), FieldType::Scalar(mass));
+        let bf = (deps[1].function)(&entry);
+        for ((i, a), value) in bf.cmatrix_ref().unwrap().indexed_iter() {
+            assert!((value - ref_bf[[i, a]]).norm() < 1e-12);
+        }
+        entry.insert(deps[1].name.to_string(), bf);
+        let ikc_inv = (kmatrix.function)(&entry);
+        for (j, value) in ikc_inv.cvector_ref().unwrap().iter().enumerate() {
+            assert!((value - ref_ikc_inv[[1, j]]).norm() < 1e-12);
+        }
+    }
+}
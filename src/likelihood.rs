@@ -1,5 +1,4 @@
 use argmin::core::{CostFunction, Error};
-use rayon::prelude::*;
 
 use crate::prelude::{Amplitude, Dataset, Parameter};
 
@@ -8,10 +7,34 @@ pub struct ParallelExtendedMaximumLikelihood<'a> {
     pub amplitude_data: Amplitude<'a>,
     pub montecarlo: Dataset,
     pub amplitude_montecarlo: Amplitude<'a>,
-    pub parameter_order: Vec<Parameter<'a>>,
+    parameter_order: Vec<Parameter<'a>>,
+    parameter_names: Vec<&'a str>,
 }
 
 impl<'a> ParallelExtendedMaximumLikelihood<'a> {
+    pub fn new(
+        data: Dataset,
+        amplitude_data: Amplitude<'a>,
+        montecarlo: Dataset,
+        amplitude_montecarlo: Amplitude<'a>,
+        parameter_order: Vec<Parameter<'a>>,
+    ) -> Self {
+        //! Create a new likelihood. The names in `parameter_order` are collected once here rather
+        //! than on every call to [`CostFunction::cost`].
+        let parameter_names = parameter_order.iter().map(|p| p.name).collect();
+        Self {
+            data,
+            amplitude_data,
+            montecarlo,
+            amplitude_montecarlo,
+            parameter_order,
+            parameter_names,
+        }
+    }
+    pub fn parameter_order(&self) -> &[Parameter<'a>] {
+        //! The parameters in the order in which [`CostFunction::cost`] expects their values.
+        &self.parameter_order
+    }
     pub fn setup(&mut self) {
         self.amplitude_data.par_resolve_dependencies(&mut self.data);
         self.amplitude_montecarlo
@@ -22,22 +45,40 @@ impl<'a> ParallelExtendedMaximumLikelihood<'a> {
 impl<'a> CostFunction for ParallelExtendedMaximumLikelihood<'a> {
     type Param = Vec<f64>;
     type Output = f64;
+    /// Computes the extended log-likelihood (times -2) for the given parameter values.
+    ///
+    /// # Errors
+    ///
+    /// Returns an error if the amplitude fails to evaluate on any event in either dataset.
+    ///
+    /// # Examples
+    ///
+    /// ```
+    /// use argmin::core::CostFunction;
+    /// use rustitude::prelude::*;
+    ///
+    /// let likelihood = ParallelExtendedMaximumLikelihood::new(
+    ///     Dataset::new(1),
+    ///     Amplitude::default(),
+    ///     Dataset::new(1),
+    ///     Amplitude::default(),
+    ///     vec![],
+    /// );
+    /// assert!(likelihood.cost(&vec![]).is_err());
+    /// ```
     fn cost(&self, params: &Self::Param) -> Result<Self::Output, Error> {
-        let par_names: Vec<&str> = self.parameter_order.iter().map(|p| p.name).collect();
-        self.amplitude_data.load_params(params, &par_names);
-        self.amplitude_montecarlo.load_params(params, &par_names);
+        self.amplitude_data
+            .load_params(params, &self.parameter_names);
+        self.amplitude_montecarlo
+            .load_params(params, &self.parameter_names);
         let fn_data: f64 = self
             .amplitude_data
-            .par_evaluate_on(&self.data)
-            .into_par_iter()
-            .map(|val| val.re.ln())
-            .sum();
+            .par_sum_on(&self.data, |val| val.re.ln())
+            .map_err(Error::msg)?;
         let fn_mc: f64 = self
             .amplitude_montecarlo
-            .par_evaluate_on(&self.montecarlo)
-            .into_par_iter()
-            .map(|val| val.re)
-            .sum();
+            .par_sum_on(&self.montecarlo, |val| val.re)
+            .map_err(Error::msg)?;
         #[allow(clippy::cast_precision_loss)]
         Ok(-2.0
             * (fn_data - (self.data.n_entries as f64 / self.montecarlo.n_entries as f64) * fn_mc))
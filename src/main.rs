@@ -183,16 +183,16 @@ fn main() {
     }
     println!("{}", f0_500.value.cscalar().unwrap());
 
-    let mut likelihood = ParallelExtendedMaximumLikelihood {
-        data: dataset,
+    let mut likelihood = ParallelExtendedMaximumLikelihood::new(
+        dataset,
         amplitude_data,
-        montecarlo: dataset_mc,
+        dataset_mc,
         amplitude_montecarlo,
-        parameter_order: vec![
+        vec![
             f0_500, f0_980, f0_1370, f0_1500, f0_1710, f2_1270, f2_1525, f2_1810, f2_1950, a0_980,
             a0_1450, a2_1320, a2_1700,
         ],
-    };
+    );
 
     likelihood.setup();
 